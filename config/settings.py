@@ -545,6 +545,15 @@ def _flatten_json_config(data: dict[str, Any]) -> dict[str, Any]:
     return result
 
 
+@lru_cache(maxsize=8)
+def _parse_config_json(text: str) -> dict[str, Any]:
+    """按原始文本缓存 config.json 解析结果；调用方必须视为只读。"""
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("config.json root must be an object")
+    return data
+
+
 class EnvInterpolatedJsonConfigSettingsSource(JsonConfigSettingsSource):
     def __init__(self, settings_cls: type[BaseSettings]) -> None:
         super().__init__(
@@ -556,9 +565,8 @@ class EnvInterpolatedJsonConfigSettingsSource(JsonConfigSettingsSource):
     def __call__(self) -> dict[str, Any]:
         if not CONFIG_FILE.exists():
             return {}
-        data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-        if not isinstance(data, dict):
-            raise ValueError("config.json root must be an object")
+        data = _parse_config_json(CONFIG_FILE.read_text(encoding="utf-8"))
+        # _resolve_env_refs 会重建所有容器，缓存中的解析结果不会被下游修改
         resolved = _resolve_env_refs(data, _secret_environment())
         return _flatten_json_config(_merge_minecraft_commands(resolved))
 
@@ -90,15 +90,11 @@ class ConversationCompressor:
         self._summarizer = summarizer
 
     def count_turns(self, history: list[ModelMessage]) -> int:
-        turns = 0
-        for message in history:
-            if self.is_summary_message(message):
-                continue
-            for part in getattr(message, "parts", []):
-                if getattr(part, "part_kind", None) == "user-prompt":
-                    turns += 1
-                    break
-        return turns
+        return sum(
+            1
+            for message in history
+            if self._is_user_turn(message) and not self.is_summary_message(message)
+        )
 
     def split_history(
         self,
@@ -118,19 +114,28 @@ class ConversationCompressor:
         if keep_turns <= 0:
             return list(history), []
 
+        cut_idx = ConversationCompressor._find_keep_turns_cut(history, keep_turns)
+        if cut_idx is None:
+            return [], list(history)
+        return history[:cut_idx], history[cut_idx:]
+
+    @staticmethod
+    def _is_user_turn(message: ModelMessage) -> bool:
+        return any(
+            getattr(part, "part_kind", None) == "user-prompt"
+            for part in getattr(message, "parts", ())
+        )
+
+    @staticmethod
+    def _find_keep_turns_cut(history: list[ModelMessage], keep_turns: int) -> int | None:
+        """从尾部反向扫描，返回最近 keep_turns 轮的起始下标；轮次不足时返回 None。"""
         user_turns = 0
-        cut_idx = len(history)
         for idx in range(len(history) - 1, -1, -1):
-            message = history[idx]
-            if any(getattr(part, "part_kind", None) == "user-prompt" for part in getattr(message, "parts", [])):
+            if ConversationCompressor._is_user_turn(history[idx]):
                 user_turns += 1
                 if user_turns == keep_turns:
-                    cut_idx = idx
-                    break
-
-        if user_turns < keep_turns:
-            return [], list(history)
-        return list(history[:cut_idx]), list(history[cut_idx:])
+                    return idx
+        return None
 
     def serialize_messages_for_summary(self, messages: list[ModelMessage]) -> str:
         lines: list[str] = []
@@ -570,24 +575,8 @@ class ConversationManager:
         if max_turns <= 0:
             return []
 
-        user_turns = 0
-        cut_idx = 0
-
-        for idx in range(len(history) - 1, -1, -1):
-            message = history[idx]
-            for part in message.parts:
-                if getattr(part, "part_kind", None) == "user-prompt":
-                    user_turns += 1
-                    if user_turns == max_turns:
-                        cut_idx = idx
-                        break
-            if user_turns == max_turns:
-                break
-
-        if user_turns < max_turns:
-            return list(history)
-
-        return list(history[cut_idx:])
+        _older, recent = self.compressor.split_history(history, max_turns)
+        return recent
 
     def _extract_summary(self, history: list[ModelMessage], keep_turns: int) -> str:
         """从历史中提取摘要信息"""
@@ -656,9 +645,8 @@ class ConversationManager:
             return False, "对话历史为空，无法保存"
 
         try:
-            # 序列化消息：使用 dump_json 序列化为 JSON 字节
-            messages_json_bytes = ModelMessagesTypeAdapter.dump_json(history)
-            messages_json_str = messages_json_bytes.decode("utf-8")
+            # 序列化消息：mode="json" 直接得到可写入 JSON 的对象，省去 dump_json + json.loads 往返
+            messages_payload = ModelMessagesTypeAdapter.dump_python(history, mode="json")
 
             # 生成会话ID
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
@@ -682,7 +670,7 @@ class ConversationManager:
                 "created_at": datetime.now().isoformat(),
                 "updated_at": datetime.now().isoformat(),
                 "message_count": len(history),
-                "messages": json.loads(messages_json_str),
+                "messages": messages_payload,
                 "metadata": {
                     "title": title,
                     "template": template,
@@ -200,7 +200,7 @@ class AgentResponse:
     player_name: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:
     """流式事件"""
 
@@ -728,7 +728,7 @@ def _extract_deferred_requests(result: Any) -> DeferredToolRequests | None:
 
 
 def _build_approval_required_event(
-    ctx: _HandlerContext,
+    ctx: "_HandlerContext",
     deps: AgentDependencies,
     deferred: DeferredToolRequests,
     result: Any,
@@ -853,6 +853,17 @@ def _extract_complete_sentences(buffer: str) -> tuple[list[str], str]:
     return sentences, buffer[last_end:]
 
 
+def _append_and_extract_sentences(buffer: str, chunk: str) -> tuple[list[str], str]:
+    """追加增量并提取完整句子。
+
+    缓冲区尾部不含句末标点，增量中也没有时不可能产生新句子，
+    直接拼接即可，避免长句逐 token 重复扫描整个缓冲区。
+    """
+    if not SENTENCE_END_PATTERN.search(chunk):
+        return [], buffer + chunk
+    return _extract_complete_sentences(buffer + chunk)
+
+
 def _append_sent_text(sent_text: str, new_text: str) -> str:
     if not new_text:
         return sent_text
@@ -952,8 +963,9 @@ def _append_reasoning_and_extract(ctx: _HandlerContext, chunk: str) -> list[str]
     """将思考增量写入独立缓冲，并提取已完成的句子。"""
     if not chunk:
         return []
-    ctx.reasoning_buffer += chunk
-    sentences, ctx.reasoning_buffer = _extract_complete_sentences(ctx.reasoning_buffer)
+    sentences, ctx.reasoning_buffer = _append_and_extract_sentences(
+        ctx.reasoning_buffer, chunk
+    )
     return sentences
 
 
@@ -1083,10 +1095,9 @@ async def stream_response_handler(
                                             content=part.content,
                                             connection_id=str(deps.connection_id),
                                         )
-                                        ctx.sentence_buffer += part.content
                                         sentences, ctx.sentence_buffer = (
-                                            _extract_complete_sentences(
-                                                ctx.sentence_buffer
+                                            _append_and_extract_sentences(
+                                                ctx.sentence_buffer, part.content
                                             )
                                         )
                                         for sentence in sentences:
@@ -1129,10 +1140,9 @@ async def stream_response_handler(
                                             buffer_before=ctx.sentence_buffer,
                                         )
                                         if chunk:
-                                            ctx.sentence_buffer += chunk
                                             sentences, ctx.sentence_buffer = (
-                                                _extract_complete_sentences(
-                                                    ctx.sentence_buffer
+                                                _append_and_extract_sentences(
+                                                    ctx.sentence_buffer, chunk
                                                 )
                                             )
                                             logger.debug(
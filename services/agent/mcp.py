@@ -16,6 +16,20 @@ from config.settings import Settings, MCPServerConfig, get_settings
 
 logger = get_logger(__name__)
 
+# 初始化时并发测试连接的上限，避免同时拉起过多 stdio 子进程
+_MAX_PARALLEL_CONNECTION_TESTS = 8
+
+
+def _config_hash(config: MCPServerConfig) -> int:
+    """计算决定工具集构建结果的配置字段哈希，用于重载时的变更检测"""
+    return hash((
+        config.command,
+        tuple(config.args),
+        config.url,
+        config.timeout,
+        frozenset(config.env.items()),
+    ))
+
 
 class MCPConnectionStatus(str, Enum):
     """MCP 连接状态
@@ -30,7 +44,7 @@ class MCPConnectionStatus(str, Enum):
     DISABLED = "disabled"  # 禁用（配置无效）
 
 
-@dataclass
+@dataclass(slots=True)
 class MCPServerInfo:
     """MCP 服务器信息"""
 
@@ -42,6 +56,7 @@ class MCPServerInfo:
     last_run_time: datetime | None = None
     last_run_success: bool | None = None
     tools: list[str] = field(default_factory=list)
+    config_hash: int | None = None
 
 
 class MCPManager:
@@ -139,6 +154,7 @@ class MCPManager:
             )
 
             # 创建所有服务器的工具集
+            servers_to_test: list[str] = []
             for server_name, server_config in self._settings.mcp.servers.items():
                 toolset = self._create_toolset(server_name, server_config)
                 status = MCPConnectionStatus.PENDING if toolset else MCPConnectionStatus.DISABLED
@@ -148,11 +164,14 @@ class MCPManager:
                     config=server_config,
                     toolset=toolset,
                     status=status,
+                    config_hash=_config_hash(server_config),
                 )
+                if toolset:
+                    servers_to_test.append(server_name)
 
-                # 可选：在初始化时测试连接
-                if test_connections and toolset:
-                    await self._test_server_connection(server_name)
+            # 可选：在初始化时测试连接（各服务器互不依赖，并发进行）
+            if test_connections and servers_to_test:
+                await self._test_server_connections(servers_to_test)
 
             self._initialized = True
 
@@ -169,6 +188,30 @@ class MCPManager:
 
             return active_count > 0
 
+    async def _test_server_connections(self, server_names: list[str]) -> None:
+        """
+        并发测试多个服务器的连接
+
+        stdio 子进程启动与 HTTP 握手的等待相互重叠，总耗时取决于最慢的服务器；
+        信号量限制同时进行的连接测试数量。
+
+        Args:
+            server_names: 服务器名称列表
+        """
+        semaphore = asyncio.Semaphore(_MAX_PARALLEL_CONNECTION_TESTS)
+
+        async def _test_one(server_name: str) -> bool:
+            async with semaphore:
+                return await self._test_server_connection(server_name)
+
+        results = await asyncio.gather(
+            *(_test_one(server_name) for server_name in server_names),
+            return_exceptions=True,
+        )
+        for server_name, result in zip(server_names, results, strict=True):
+            if isinstance(result, Exception):
+                self.mark_server_failed(server_name, str(result))
+
     async def _test_server_connection(self, server_name: str) -> bool:
         """
         测试指定服务器的连接
@@ -450,12 +493,16 @@ class MCPManager:
             return info.toolset
         return None
 
-    def reload_toolset(self, server_name: str) -> bool:
+    def reload_toolset(self, server_name: str, force: bool = False) -> bool:
         """
         重新加载指定服务器的工具集
 
+        配置未变化且工具集仍可用时跳过重建，避免无谓地重启子进程；
+        处于 ERROR / DISABLED 状态的服务器总是重建。
+
         Args:
             server_name: 服务器名称
+            force: 是否忽略配置哈希强制重建
 
         Returns:
             是否成功
@@ -465,8 +512,21 @@ class MCPManager:
             logger.warning("mcp_reload_server_not_found", server=server_name)
             return False
 
+        config = self._settings.mcp.servers.get(server_name, info.config)
+        config_hash = _config_hash(config)
+        if (
+            not force
+            and config_hash == info.config_hash
+            and info.toolset is not None
+            and info.status in (MCPConnectionStatus.PENDING, MCPConnectionStatus.ACTIVE)
+        ):
+            logger.info("mcp_toolset_reload_skipped", server=server_name)
+            return True
+
         # 重新创建工具集
-        new_toolset = self._create_toolset(server_name, info.config)
+        info.config = config
+        info.config_hash = config_hash
+        new_toolset = self._create_toolset(server_name, config)
         if new_toolset:
             info.toolset = new_toolset
             info.status = MCPConnectionStatus.PENDING
@@ -573,17 +633,14 @@ def load_mcp_toolsets(settings: Settings | None = None) -> list[Any]:
         MCP 工具集列表，可直接传给 Agent 的 toolsets 参数
     """
     settings = settings or get_settings()
-    toolsets: list[Any] = []
 
     mcp_config = settings.mcp
     if not mcp_config.enabled:
         logger.info("mcp_disabled")
-        return toolsets
+        return []
 
-    for server_name, server_config in mcp_config.servers.items():
-        toolset = create_mcp_toolset(server_name, server_config)
-        if toolset:
-            toolsets.append(toolset)
+    # settings.mcp.servers 已在 Settings 边界完成校验，直接构建
+    toolsets = _build_toolsets(mcp_config.servers)
 
     logger.info(
         "mcp_toolsets_loaded",
@@ -593,9 +650,9 @@ def load_mcp_toolsets(settings: Settings | None = None) -> list[Any]:
     return toolsets
 
 
-def load_mcp_toolsets_from_dict(config_dict: dict[str, Any]) -> list[Any]:
+def _parse_mcp_servers(config_dict: dict[str, Any]) -> dict[str, MCPServerConfig]:
     """
-    从字典配置加载 MCP 工具集
+    校验字典配置并转换为 MCPServerConfig
 
     支持两种格式：
     1. 官方格式: {"mcpServers": {"server-name": {...}}}
@@ -605,24 +662,46 @@ def load_mcp_toolsets_from_dict(config_dict: dict[str, Any]) -> list[Any]:
         config_dict: MCP 配置字典
 
     Returns:
-        MCP 工具集列表
+        服务器名称 -> 已校验配置；非字典条目被跳过
     """
-    toolsets: list[Any] = []
-
     # 提取 mcpServers 部分
     servers_data = config_dict.get("mcpServers", config_dict)
     if not isinstance(servers_data, dict):
         logger.warning("mcp_config_invalid_format")
-        return toolsets
+        return {}
+
+    return {
+        server_name: MCPServerConfig(**server_config)
+        for server_name, server_config in servers_data.items()
+        if isinstance(server_config, dict)
+    }
 
-    for server_name, server_config in servers_data.items():
-        if not isinstance(server_config, dict):
-            continue
 
-        config = MCPServerConfig(**server_config)
-        toolset = create_mcp_toolset(server_name, config)
+def _build_toolsets(servers: dict[str, MCPServerConfig]) -> list[Any]:
+    """按已校验的服务器配置创建工具集，不再重复校验结构。"""
+    toolsets: list[Any] = []
+    for server_name, server_config in servers.items():
+        toolset = create_mcp_toolset(server_name, server_config)
         if toolset:
             toolsets.append(toolset)
+    return toolsets
+
+
+def load_mcp_toolsets_from_dict(config_dict: dict[str, Any]) -> list[Any]:
+    """
+    从字典配置加载 MCP 工具集
+
+    支持两种格式：
+    1. 官方格式: {"mcpServers": {"server-name": {...}}}
+    2. 简化格式: {"server-name": {...}}
+
+    Args:
+        config_dict: MCP 配置字典
+
+    Returns:
+        MCP 工具集列表
+    """
+    toolsets = _build_toolsets(_parse_mcp_servers(config_dict))
 
     logger.info("mcp_toolsets_loaded_from_dict", count=len(toolsets))
     return toolsets
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Iterable
 from urllib.parse import quote
 
@@ -14,9 +15,10 @@ def normalize_limit(limit: int | None, default: int = 10) -> int:
     """规范化搜索结果数量限制"""
     if limit is None:
         return default
+    # 纯比较链比 min()/max() 内置调用更快
     if limit < MIN_SEARCH_LIMIT:
         return MIN_SEARCH_LIMIT
-    return min(limit, MAX_SEARCH_LIMIT)
+    return MAX_SEARCH_LIMIT if limit > MAX_SEARCH_LIMIT else limit
 
 
 def build_search_params(
@@ -47,15 +49,21 @@ def build_mcwiki_url(base_url: str, path: str) -> str:
     return f"{base}/{path_part}"
 
 
+@lru_cache(maxsize=1024)
+def _quote_page_name(page_name: str) -> str:
+    """页面名百分号编码；同名页面会被反复查询，缓存编码结果"""
+    return quote(page_name, safe="")
+
+
 def build_page_url(base_url: str, page_name: str) -> str:
     """构建页面内容请求 URL"""
-    encoded_name = quote(page_name, safe="")
+    encoded_name = _quote_page_name(page_name)
     return build_mcwiki_url(base_url, f"api/page/{encoded_name}")
 
 
 def build_page_exists_url(base_url: str, page_name: str) -> str:
     """构建页面存在性检查 URL"""
-    encoded_name = quote(page_name, safe="")
+    encoded_name = _quote_page_name(page_name)
     return build_mcwiki_url(base_url, f"api/page/{encoded_name}/exists")
 
 
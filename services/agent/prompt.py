@@ -1,6 +1,10 @@
 """提示词模板管理器"""
 
+import re
+import time
+from collections.abc import Callable
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Protocol, cast
 
 from pydantic import BaseModel
@@ -43,6 +47,54 @@ SYSTEM_TRUST_CONSTRAINTS = f"""
 """.strip()
 
 
+# 模板占位符：{name}；不在变量表中的花括号内容原样保留
+_PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]+)\}")
+
+
+@lru_cache(maxsize=256)
+def _template_placeholders(content: str) -> frozenset[str]:
+    """解析文本中出现的占位符名称（按内容缓存，只解析一次）"""
+    return frozenset(_PLACEHOLDER_PATTERN.findall(content))
+
+
+@lru_cache(maxsize=512)
+def _render_prompt(
+    content: str,
+    values: tuple[tuple[str, str], ...],
+    unused_custom_vars: tuple[tuple[str, str], ...],
+) -> str:
+    """
+    渲染提示词（按输入缓存）
+
+    values 为按变量顺序排列、实际被引用到的变量。逐个替换，
+    已替换进来的值中顺序靠后的占位符同样会被展开。
+    缓存键只包含模板内容、被引用变量的值和未使用的自定义变量，
+    因此模板或变量变化会自然落到新键上，无需显式失效。
+    """
+    for key, value in values:
+        content = content.replace(f"{{{key}}}", value)
+
+    # 如果有未使用的自定义变量，追加到提示词末尾
+    if unused_custom_vars:
+        content += "\n\n--- 自定义变量 ---\n"
+        for key, value in unused_custom_vars:
+            # 去掉 custom_ 前缀显示
+            display_name = key[7:] if key.startswith("custom_") else key
+            content += f"{display_name}: {value}\n"
+
+    # 版本化信任边界约束始终附加，确保摘要/工具结果不能覆盖系统策略
+    if SYSTEM_TRUST_CONSTRAINTS not in content:
+        content = f"{content.rstrip()}\n\n{SYSTEM_TRUST_CONSTRAINTS}"
+
+    return content
+
+
+@lru_cache(maxsize=1)
+def _format_server_time(epoch_second: int) -> str:
+    """格式化服务器时间（秒级精度，同一秒内复用结果）"""
+    return datetime.fromtimestamp(epoch_second).strftime("%Y-%m-%d %H:%M:%S")
+
+
 class PromptTemplate(BaseModel):
     """提示词模板"""
 
@@ -346,58 +398,51 @@ class PromptManager:
         # 获取变量
         custom_vars = self.get_session_variables(connection_id, player_name)
 
-        tool_usage = TOOL_USAGE_GUIDE
-        if (
-            settings is not None
-            and settings.runtime_harness_enabled
-            and settings.runtime_harness_prompt_enabled
-        ):
-            tool_usage = render_runtime_harness_prompt()
-
-        # 构建内置变量
-        builtin_vars = {
+        def _tool_usage() -> str:
+            if (
+                settings is not None
+                and settings.runtime_harness_enabled
+                and settings.runtime_harness_prompt_enabled
+            ):
+                return render_runtime_harness_prompt()
+            return TOOL_USAGE_GUIDE
+
+        # 构建内置变量；server_time / tool_usage 开销较大，被引用到时才计算
+        builtin_vars: dict[str, str | Callable[[], str]] = {
             "player_name": player_name or "未知玩家",
             "connection_id": connection_id[:8] if connection_id else "",
             "provider": provider or "deepseek",
             "model": model or "deepseek-chat",
-            "server_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "server_time": lambda: _format_server_time(int(time.time())),
             "context_length": str(context_length),
             "context_usage": context_usage,
             "system_prompt": settings.system_prompt if settings is not None else DEFAULT_SYSTEM_PROMPT,
-            "tool_usage": tool_usage,
+            "tool_usage": _tool_usage,
         }
 
         # 合并变量（自定义变量优先级更高）
         all_vars = {**builtin_vars, **custom_vars}
 
-        # 替换变量
-        content = template.content
-        used_custom_vars = []  # 记录已使用的自定义变量
-        unused_custom_vars = []  # 记录未使用的自定义变量
-
+        # 按变量顺序确定被引用的变量：与逐个替换一致，已引用变量值中
+        # 顺序靠后的占位符（如 system_prompt 中的 {custom_*}、{tool_usage}）同样计入
+        referenced = set(_template_placeholders(template.content))
+        values: list[tuple[str, str]] = []
         for key, value in all_vars.items():
-            placeholder = f"{{{key}}}"
-            if placeholder in content:
-                content = content.replace(placeholder, str(value))
-                if key.startswith("custom_"):
-                    used_custom_vars.append((key, value))
-            elif key.startswith("custom_"):
-                # 自定义变量且模板中没有对应占位符，记录为未使用
-                unused_custom_vars.append((key, value))
-
-        # 如果有未使用的自定义变量，追加到提示词末尾
-        if unused_custom_vars:
-            content += "\n\n--- 自定义变量 ---\n"
-            for key, value in unused_custom_vars:
-                # 去掉 custom_ 前缀显示
-                display_name = key[7:] if key.startswith("custom_") else key
-                content += f"{display_name}: {value}\n"
-
-        # 版本化信任边界约束始终附加，确保摘要/工具结果不能覆盖系统策略
-        if SYSTEM_TRUST_CONSTRAINTS not in content:
-            content = f"{content.rstrip()}\n\n{SYSTEM_TRUST_CONSTRAINTS}"
-
-        return content
+            if key not in referenced:
+                continue
+            text = value() if callable(value) else str(value)
+            values.append((key, text))
+            referenced.update(_template_placeholders(text))
+
+        # 自定义变量且未被引用，记录为未使用
+        used_keys = {key for key, _ in values}
+        unused_custom_vars = tuple(
+            (key, str(value))
+            for key, value in custom_vars.items()
+            if key.startswith("custom_") and key not in used_keys
+        )
+
+        return _render_prompt(template.content, tuple(values), unused_custom_vars)
 
 
 def get_prompt_manager() -> PromptManager:
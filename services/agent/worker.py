@@ -4,6 +4,7 @@ import asyncio
 import copy
 import dataclasses
 import time
+from collections.abc import Iterator
 from uuid import UUID, uuid4
 
 import httpx
@@ -1295,8 +1296,12 @@ class AgentWorker:
         for message in messages:
             sanitized_message, message_cleared = cls._sanitize_model_message(message)
             if sanitized_message is None:
-                sanitized_message = copy.deepcopy(message)
-                message_cleared = cls._clear_reasoning_content_in_object(sanitized_message)
+                # 只有确实包含推理内容的消息才深拷贝，其余按引用复用
+                if next(cls._iter_reasoning_content_holders(message), None) is None:
+                    sanitized_message = message
+                else:
+                    sanitized_message = copy.deepcopy(message)
+                    message_cleared = cls._clear_reasoning_content_in_object(sanitized_message)
 
             sanitized_messages.append(sanitized_message)
             cleared_count += message_cleared
@@ -1342,55 +1347,57 @@ class AgentWorker:
 
         return dataclasses.replace(message, parts=updated_parts), cleared_count
 
-    @classmethod
-    def _clear_reasoning_content_in_object(
-        cls,
+    @staticmethod
+    def _iter_reasoning_content_holders(
         obj: object,
-        visited: set[int] | None = None,
-    ) -> int:
-        """递归清空对象图中的 reasoning_content 字段。"""
-        if visited is None:
-            visited = set()
-
-        obj_id = id(obj)
-        if obj_id in visited:
-            return 0
-        visited.add(obj_id)
-
-        cleared_count = 0
-
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                if key == "reasoning_content" and isinstance(value, str) and value:
-                    obj[key] = ""
-                    cleared_count += 1
-                else:
-                    cleared_count += cls._clear_reasoning_content_in_object(value, visited)
-            return cleared_count
+    ) -> Iterator[tuple[object, str | None]]:
+        """迭代遍历对象图，产出持有非空 reasoning_content 的 (对象, 字典键)。
 
-        if isinstance(obj, list):
-            for item in obj:
-                cleared_count += cls._clear_reasoning_content_in_object(item, visited)
-            return cleared_count
+        对象属性命中时键为 None。使用显式栈而非递归，共享子树只访问一次。
+        """
+        stack: list[object] = [obj]
+        visited: set[int] = set()
+
+        while stack:
+            current = stack.pop()
+            current_id = id(current)
+            if current_id in visited:
+                continue
+            visited.add(current_id)
+
+            if isinstance(current, dict):
+                for key, value in list(current.items()):
+                    if key == "reasoning_content" and isinstance(value, str) and value:
+                        yield current, key
+                    else:
+                        stack.append(value)
+                continue
 
-        if isinstance(obj, tuple):
-            for item in obj:
-                cleared_count += cls._clear_reasoning_content_in_object(item, visited)
-            return cleared_count
+            if isinstance(current, (list, tuple)):
+                stack.extend(current)
+                continue
 
-        if hasattr(obj, "reasoning_content"):
-            value = getattr(obj, "reasoning_content", None)
+            value = getattr(current, "reasoning_content", None)
             if isinstance(value, str) and value:
-                try:
-                    setattr(obj, "reasoning_content", "")
-                    cleared_count += 1
-                except (AttributeError, TypeError, ValueError):
-                    pass
+                yield current, None
 
-        if hasattr(obj, "__dict__"):
-            for value in vars(obj).values():
-                cleared_count += cls._clear_reasoning_content_in_object(value, visited)
+            if hasattr(current, "__dict__"):
+                stack.extend(vars(current).values())
 
+    @classmethod
+    def _clear_reasoning_content_in_object(cls, obj: object) -> int:
+        """清空对象图中的 reasoning_content 字段。"""
+        cleared_count = 0
+        for holder, key in cls._iter_reasoning_content_holders(obj):
+            if isinstance(holder, dict):
+                holder[key] = ""
+                cleared_count += 1
+                continue
+            try:
+                setattr(holder, "reasoning_content", "")
+                cleared_count += 1
+            except (AttributeError, TypeError, ValueError):
+                pass
         return cleared_count
 
     def _create_send_callback(self, connection_id: UUID):
@@ -1467,7 +1467,7 @@ class CommandHandlers:
                 if arg not in manager.servers:
                     msg = self.protocol.create_error_message(f"未找到服务器: {arg}")
                 else:
-                    success = manager.reload_toolset(arg)
+                    success = manager.reload_toolset(arg, force=True)
                     if success:
                         from services.agent.runtime import get_agent_runtime
 
@@ -1,8 +1,6 @@
 """Agent addon 高层工具测试。"""
 
 import asyncio
-import sys
-from pathlib import Path
 from types import SimpleNamespace
 from uuid import uuid4
 
@@ -10,9 +8,6 @@ import httpx
 import pytest
 from pydantic_ai import Agent
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
-
 from config.settings import Settings
 from models.agent import AgentDependencies
 from services.agent.tools import iter_registered_tools, register_agent_tools
@@ -4,10 +4,6 @@ import json
 from pathlib import Path
 from types import SimpleNamespace
 from uuid import uuid4
-import sys
-
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT))
 
 import pytest
 from pydantic_ai import Agent
@@ -28,6 +24,8 @@ from services.agent.tools import (
     register_agent_tools,
 )
 
+ROOT = Path(__file__).resolve().parents[1]
+
 
 def _flush_audit() -> None:
     """Async audit writer needs a drain before tests read JSONL."""
@@ -228,14 +228,18 @@ async def test_request_done_called_once_on_cancel():
     worker = AgentWorker(broker, settings)
     worker._running = True
 
+    processing = asyncio.Event()
+
     async def hang(_item):
         # 模拟处理中被取消
+        processing.set()
         await asyncio.sleep(3600)
 
     with patch.object(worker, "_process_request", side_effect=hang):
         task = asyncio.create_task(worker._run())
         await got_item.wait()
-        await asyncio.sleep(0)  # 让 _process_request 启动
+        # 等 _process_request 真正开始再取消；单次 sleep(0) 在 3.11 的 wait_for 下可能取消落空
+        await asyncio.wait_for(processing.wait(), timeout=1.0)
         task.cancel()
         with pytest.raises(asyncio.CancelledError):
             await task
@@ -2,16 +2,13 @@
 
 import asyncio
 import json
-import sys
 from pathlib import Path
+from itertools import count
 from types import SimpleNamespace
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 import pytest
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
-
 from pydantic_ai.messages import (
     ModelRequest,
     ModelResponse,
@@ -25,6 +22,14 @@ from core.conversation import ConversationManager
 from services.agent.context import UNTRUSTED_HISTORY_MARKER
 
 
+_connection_ids = count(1)
+
+
+def _new_connection_id() -> UUID:
+    """测试内只需唯一的连接 ID；写入磁盘的文件名仍用 uuid4 保证跨次运行唯一。"""
+    return UUID(int=next(_connection_ids))
+
+
 def _build_turn(index: int) -> list:
     """构建一个用户-AI对话轮次"""
     return [
@@ -64,7 +69,8 @@ class MockBroker:
         return (str(connection_id), player_name or "__anonymous__", conversation_id or "default")
 
     def get_conversation_history(self, connection_id, player_name=None, conversation_id="default"):
-        return list(self._histories.get(self._key(connection_id, player_name, conversation_id), []))
+        # ConversationManager 不会原地修改读到的历史，按引用返回即可，无需像真实 broker 一样复制
+        return self._histories.get(self._key(connection_id, player_name, conversation_id), [])
 
     def get_conversation_generation(self, connection_id, player_name=None, conversation_id="default"):
         return self._generations.get(self._key(connection_id, player_name, conversation_id), 0)
@@ -80,7 +86,7 @@ class MockBroker:
         current_generation = self._generations.get(key, 0)
         if expected_generation is not None and expected_generation != current_generation:
             return False
-        self._histories[key] = list(history or [])
+        self._histories[key] = history if history is not None else []
         self._generations[key] = current_generation + 1
         return True
 
@@ -338,7 +344,7 @@ async def test_compress_history_writes_llm_summary_and_recent_turns(monkeypatch)
     )
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     broker.set_conversation_history(connection_id, "alice", _build_multi_turn(12), "build")
 
     async def fake_llm_summary(messages, provider_name=None):
@@ -367,7 +373,7 @@ async def test_compression_only_updates_target_player_conversation(monkeypatch):
     settings = Settings(compression_keep_recent_turns=2)
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     broker.set_conversation_history(connection_id, "alice", _build_multi_turn(8), "build")
     broker.set_conversation_history(connection_id, "bob", _build_multi_turn(4), "build")
     broker.set_conversation_history(connection_id, "alice", _build_multi_turn(5), "redstone")
@@ -398,7 +404,7 @@ async def test_check_and_compress_limits_keep_turns_below_low_threshold(monkeypa
     settings = Settings(max_history_turns=5, compression_keep_recent_turns=8)
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     broker.set_conversation_history(connection_id, "alice", _build_multi_turn(5), "build")
 
     async def fake_llm_summary(messages, provider_name=None):
@@ -430,7 +436,7 @@ async def test_compress_history_falls_back_to_local_summary(monkeypatch):
     )
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     broker.set_conversation_history(connection_id, "alice", _build_multi_turn(8), "build")
 
     async def failing_llm_summary(messages, provider_name=None):
@@ -461,7 +467,7 @@ async def test_compression_skips_stale_generation_write(monkeypatch):
     )
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     broker.set_conversation_history(connection_id, "alice", _build_multi_turn(12), "build")
 
     async def fake_llm_summary(messages, provider_name=None):
@@ -546,7 +552,7 @@ async def test_compress_history():
 
     manager = ConversationManager(broker, settings, summarizer=offline_summarizer)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
 
     # 构建25轮对话（超过阈值16轮）
     messages = _build_multi_turn(25)
@@ -575,7 +581,7 @@ async def test_check_and_compress_not_needed():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
 
     # 只构建5轮对话（不超过阈值16轮）
     messages = _build_multi_turn(5)
@@ -594,7 +600,7 @@ async def test_check_and_compress_force(fake_summarizer):
     broker = MockBroker()
     manager = ConversationManager(broker, settings, summarizer=fake_summarizer)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
 
     # 构建10轮对话，超过默认保留的最近8轮，强制压缩可产生旧历史摘要
     messages = _build_multi_turn(10)
@@ -615,7 +621,7 @@ async def test_check_and_compress_disabled_without_force():
     settings = Settings(compression_enabled=False)
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     broker.set_conversation_history(connection_id, _build_multi_turn(25))
 
     success, msg = await manager.check_and_compress(connection_id, None, force=False)
@@ -631,7 +637,7 @@ async def test_save_and_load_conversation():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     player_name = "TestPlayer"
 
     # 构建3轮对话
@@ -671,7 +677,7 @@ async def test_save_and_restore_compressed_summary_message(monkeypatch):
     settings = Settings(compression_keep_recent_turns=2)
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     player_name = "Alice"
     broker.set_conversation_history(connection_id, player_name, _build_multi_turn(6), "build")
 
@@ -713,7 +719,7 @@ async def test_save_conversation_persists_runtime_title():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     player_name = "Builder"
     conversation_id = "default"
 
@@ -746,7 +752,7 @@ async def test_delete_conversation():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     player_name = "OwnerPlayer"
 
     # 构建并保存对话
@@ -853,7 +859,7 @@ async def test_restore_conversation():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     player_name = "TestPlayer"
 
     # 构建并保存对话
@@ -894,7 +900,7 @@ async def test_owner_check_same_owner_success():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     owner = "Alice"
     messages = _build_multi_turn(2)
     broker.set_conversation_history(connection_id, owner, messages)
@@ -938,7 +944,7 @@ async def test_owner_check_cross_owner_reject():
     broker = MockBroker()
     manager = ConversationManager(broker, settings)
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     owner = "Alice"
     intruder = "Bob"
     messages = _build_multi_turn(2)
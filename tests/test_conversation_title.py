@@ -1,14 +1,9 @@
 """对话标题生成服务测试"""
 
-import sys
-from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
-
 from services.agent import title as title_module
 from services.agent.title import clean_conversation_title, generate_conversation_title
 
@@ -2,14 +2,9 @@
 
 import asyncio
 import json
-import sys
-from pathlib import Path
 from uuid import uuid4
 
 import pytest
-
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 from mcbe_ws_sdk import FlowControlSettings
 from mcbe_ws_sdk.gateway.connection import ConnectionState
 
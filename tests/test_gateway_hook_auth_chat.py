@@ -3,16 +3,12 @@
 from __future__ import annotations
 
 import asyncio
-import sys
-from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 from mcbe_ws_sdk import FlowControlSettings
 from mcbe_ws_sdk.command.registry import ParsedCommand
 from mcbe_ws_sdk.gateway.connection import ConnectionState
@@ -1,11 +1,7 @@
 """HostSessionStore unit tests."""
 
-import sys
-from pathlib import Path
 from uuid import uuid4
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 from services.gateway.session_store import HostSessionStore
 
 
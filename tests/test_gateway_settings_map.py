@@ -1,10 +1,5 @@
 """Host Settings → SDK GatewaySettings / CommandRegistry mapping."""
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 from config.settings import Settings
 from services.gateway.settings_map import build_command_registry, build_gateway_settings
 
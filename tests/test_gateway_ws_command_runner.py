@@ -1,14 +1,9 @@
 """WsCommandRunner unit tests."""
 
 import asyncio
-import sys
-from pathlib import Path
 from uuid import uuid4
 
 import pytest
-
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 from mcbe_ws_sdk import FlowControlSettings, MinecraftCommandResponse
 from mcbe_ws_sdk.gateway.connection import ConnectionState
 
@@ -20,13 +15,16 @@ async def test_ws_command_runner_resolve_completes_future():
     flow = FlowControlSettings()
     runner = WsCommandRunner(flow, timeout=1.0)
     sent: list[str] = []
+    payload_sent = asyncio.Event()
 
     async def send_payload(payload: str) -> None:
         sent.append(payload)
+        payload_sent.set()
 
     state = ConnectionState(id=uuid4(), send_payload=send_payload)
     task = asyncio.create_task(runner.run(state, "say hello"))
-    await asyncio.sleep(0)  # let run() register + send
+    # before_send 注册 future 后才会发送，等到发送即可确定 requestId 已入表
+    await asyncio.wait_for(payload_sent.wait(), timeout=1.0)
     assert sent, "expected raw command payload"
     bucket = runner._pending[state.id]
     request_id = next(iter(bucket.keys()))
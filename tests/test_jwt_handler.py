@@ -1,14 +1,8 @@
 """JWT Handler 测试"""
 
-import sys
-from pathlib import Path
-
 import jwt
 import pytest
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
-
 from config.settings import Settings
 from services.auth.jwt_handler import JWTHandler
 
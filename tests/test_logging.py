@@ -5,14 +5,11 @@
 """
 
 import logging
-import sys
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 from config.logging import setup_logging
 from config.settings import (
     LoggingConfig,
@@ -1,12 +1,9 @@
 import asyncio
 import json
-import sys
 from pathlib import Path
 
 import pytest
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
 import tools_mcbe_ws_recorder
 from models.minecraft import MinecraftMessage
 from tools_mcbe_ws_recorder import PacketRecord, ProxyRecorder, RecorderLogger, SessionRecorder, load_replay_packets, replay_delay
@@ -1,9 +1,32 @@
 """MCP 客户端测试"""
 
 import asyncio
+
 import pytest
 
-from config.settings import MCPServerConfig, MCPConfig, Settings
+from config.settings import MCPConfig, MCPServerConfig, Settings
+from services.agent.mcp import (
+    MCPConnectionStatus,
+    MCPManager,
+    MCPServerInfo,
+    _parse_mcp_servers,
+    create_mcp_toolset,
+    get_mcp_manager,
+    load_mcp_toolsets,
+    load_mcp_toolsets_from_dict,
+)
+
+
+@pytest.fixture(scope="module")
+def base_settings():
+    """模块内只构建一次 Settings，各测试使用深拷贝"""
+    return Settings()
+
+
+@pytest.fixture
+def settings(base_settings):
+    """每个测试独立的 Settings（测试会原地修改 settings.mcp）"""
+    return base_settings.model_copy(deep=True)
 
 
 class TestMCPConfig:
@@ -59,7 +82,6 @@ class TestMCPToolsetCreation:
 
     def test_create_stdio_toolset(self):
         """测试创建 stdio 工具集"""
-        from services.agent.mcp import create_mcp_toolset
 
         config = MCPServerConfig(
             command="echo",
@@ -70,7 +92,6 @@ class TestMCPToolsetCreation:
 
     def test_create_http_toolset(self):
         """测试创建 HTTP 工具集"""
-        from services.agent.mcp import create_mcp_toolset
 
         config = MCPServerConfig(
             url="http://localhost:8000/mcp",
@@ -80,7 +101,6 @@ class TestMCPToolsetCreation:
 
     def test_create_sse_toolset(self):
         """测试创建 SSE 工具集"""
-        from services.agent.mcp import create_mcp_toolset
 
         config = MCPServerConfig(
             url="http://localhost:3001/sse",
@@ -92,18 +112,15 @@ class TestMCPToolsetCreation:
 class TestLoadMCPToolsets:
     """MCP 工具集加载测试"""
 
-    def test_load_mcp_toolsets_disabled(self):
+    def test_load_mcp_toolsets_disabled(self, settings):
         """测试 MCP 禁用时不加载工具集"""
-        from services.agent.mcp import load_mcp_toolsets
 
-        settings = Settings()
         settings.mcp.enabled = False
         toolsets = load_mcp_toolsets(settings)
         assert len(toolsets) == 0
 
     def test_load_mcp_toolsets_from_dict(self):
         """测试从字典加载 MCP 工具集"""
-        from services.agent.mcp import load_mcp_toolsets_from_dict
 
         config = {
             "mcpServers": {
@@ -118,7 +135,6 @@ class TestLoadMCPToolsets:
 
     def test_load_mcp_toolsets_simple_format(self):
         """测试简化格式加载 MCP 工具集"""
-        from services.agent.mcp import load_mcp_toolsets_from_dict
 
         config = {
             "test-server": {
@@ -129,13 +145,27 @@ class TestLoadMCPToolsets:
         toolsets = load_mcp_toolsets_from_dict(config)
         assert len(toolsets) == 1
 
+    def test_parse_mcp_servers_skips_non_dict_entries(self):
+        """测试字典配置只在解析阶段校验一次，非字典条目被跳过"""
+
+        servers = _parse_mcp_servers(
+            {
+                "mcpServers": {
+                    "test-server": {"command": "echo", "args": ["hello"]},
+                    "broken": "not-a-dict",
+                }
+            }
+        )
+        assert list(servers) == ["test-server"]
+        assert isinstance(servers["test-server"], MCPServerConfig)
+        assert servers["test-server"].args == ["hello"]
+
 
 class TestMCPConnectionStatus:
     """MCP 连接状态枚举测试"""
 
     def test_status_values(self):
         """测试状态枚举值"""
-        from services.agent.mcp import MCPConnectionStatus
 
         assert MCPConnectionStatus.PENDING.value == "pending"
         assert MCPConnectionStatus.ACTIVE.value == "active"
@@ -148,7 +178,6 @@ class TestMCPServerInfo:
 
     def test_server_info_creation(self):
         """测试服务器信息创建"""
-        from services.agent.mcp import MCPServerInfo, MCPConnectionStatus
 
         config = MCPServerConfig(command="echo")
         info = MCPServerInfo(
@@ -169,35 +198,31 @@ class TestMCPServerInfo:
 class TestMCPManager:
     """MCP 管理器测试"""
 
-    def test_mcp_manager_init(self):
+    def test_mcp_manager_init(self, settings):
         """测试 MCP 管理器初始化"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         assert manager.is_initialized is False
         assert len(manager.servers) == 0
 
-    def test_mcp_manager_servers_property(self):
+    def test_mcp_manager_servers_property(self, settings):
         """测试 MCP 管理器 servers 属性"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         servers = manager.servers
         assert isinstance(servers, dict)
 
-    def test_mcp_manager_toolsets_property(self):
+    def test_mcp_manager_toolsets_property(self, settings):
         """测试 MCP 管理器 toolsets 属性"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         toolsets = manager.toolsets
         assert isinstance(toolsets, list)
 
-    def test_mcp_manager_get_status_summary(self):
+    def test_mcp_manager_get_status_summary(self, settings):
         """测试获取 MCP 状态摘要"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         summary = manager.get_status_summary()
 
         assert "enabled" in summary
@@ -206,36 +231,31 @@ class TestMCPManager:
         assert "active_servers" in summary
         assert "servers" in summary
 
-    def test_mcp_manager_get_server_info_not_found(self):
+    def test_mcp_manager_get_server_info_not_found(self, settings):
         """测试获取不存在的服务器信息"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         info = manager.get_server_info("non-existent")
         assert info is None
 
-    def test_mcp_manager_get_toolsets_for_agent(self):
+    def test_mcp_manager_get_toolsets_for_agent(self, settings):
         """测试获取用于 Agent 的工具集"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         toolsets = manager.get_toolsets_for_agent()
         assert isinstance(toolsets, list)
 
-    def test_mcp_manager_get_toolset_by_name(self):
+    def test_mcp_manager_get_toolset_by_name(self, settings):
         """测试根据名称获取工具集"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         toolset = manager.get_toolset_by_name("non-existent")
         assert toolset is None
 
-    @pytest.mark.asyncio
-    async def test_mcp_manager_initialize_disabled(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_mcp_manager_initialize_disabled(self, settings):
         """测试 MCP 禁用时的初始化"""
-        from services.agent.mcp import MCPManager
 
-        settings = Settings()
         settings.mcp.enabled = False
 
         manager = MCPManager(settings)
@@ -244,21 +264,21 @@ class TestMCPManager:
         assert result is False
         assert manager.is_initialized is True
 
-    @pytest.mark.asyncio
-    async def test_mcp_manager_shutdown(self):
+        await manager.shutdown()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_mcp_manager_shutdown(self, settings):
         """测试 MCP 管理器关闭"""
-        from services.agent.mcp import MCPManager
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         await manager.shutdown()
 
         assert manager.is_initialized is False
 
-    def test_mcp_manager_update_server_status(self):
+    def test_mcp_manager_update_server_status(self, settings):
         """测试更新服务器状态"""
-        from services.agent.mcp import MCPManager, MCPConnectionStatus, MCPServerInfo
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         # 手动添加一个服务器信息
         config = MCPServerConfig(command="echo")
         manager._servers["test-server"] = MCPServerInfo(
@@ -274,11 +294,10 @@ class TestMCPManager:
         assert manager._servers["test-server"].status == MCPConnectionStatus.ERROR
         assert manager._servers["test-server"].last_error == "test error"
 
-    def test_mcp_manager_reset_server_status(self):
+    def test_mcp_manager_reset_server_status(self, settings):
         """测试重置服务器状态"""
-        from services.agent.mcp import MCPManager, MCPConnectionStatus, MCPServerInfo
 
-        manager = MCPManager(Settings())
+        manager = MCPManager(settings)
         config = MCPServerConfig(command="echo")
         manager._servers["test-server"] = MCPServerInfo(
             name="test-server",
@@ -298,7 +317,6 @@ class TestGetMCPManager:
 
     def test_get_mcp_manager_singleton(self):
         """测试获取 MCP 管理器单例"""
-        from services.agent.mcp import get_mcp_manager, MCPManager
 
         manager1 = get_mcp_manager(Settings())
         manager2 = get_mcp_manager(Settings())
@@ -417,12 +435,10 @@ class TestSettingsMCPIntegration:
 class TestMCPManagerAsyncOperations:
     """MCP 管理器异步操作测试"""
 
-    @pytest.mark.asyncio
-    async def test_initialize_with_servers(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_initialize_with_servers(self, settings):
         """测试带服务器配置的初始化"""
-        from services.agent.mcp import MCPManager
 
-        settings = Settings()
         settings.mcp.enabled = True
         settings.mcp.servers = {
             "test-server": MCPServerConfig(
@@ -440,12 +456,45 @@ class TestMCPManagerAsyncOperations:
         # 清理
         await manager.shutdown()
 
-    @pytest.mark.asyncio
-    async def test_reload_toolset(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_initialize_tests_connections_concurrently(self, settings, monkeypatch):
+        """测试初始化时多个服务器的连接测试并发进行"""
+
+        settings.mcp.enabled = True
+        settings.mcp.servers = {
+            "server-a": MCPServerConfig(command="echo"),
+            "server-b": MCPServerConfig(command="echo"),
+        }
+
+        manager = MCPManager(settings)
+        both_started = asyncio.Event()
+        started: list[str] = []
+
+        async def fake_test_connection(server_name):
+            started.append(server_name)
+            if len(started) == 2:
+                both_started.set()
+            # 串行执行时第一个服务器会在这里一直等到超时
+            await asyncio.wait_for(both_started.wait(), timeout=1.0)
+            if server_name == "server-b":
+                raise RuntimeError("boom")
+            return True
+
+        monkeypatch.setattr(manager, "_test_server_connection", fake_test_connection)
+
+        await manager.initialize(test_connections=True)
+
+        assert sorted(started) == ["server-a", "server-b"]
+        assert manager._servers["server-a"].status == MCPConnectionStatus.PENDING
+        assert manager._servers["server-b"].status == MCPConnectionStatus.ERROR
+        assert manager._servers["server-b"].last_error == "boom"
+
+        await manager.shutdown()
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_reload_toolset(self, settings):
         """测试重新加载工具集"""
-        from services.agent.mcp import MCPManager, MCPConnectionStatus
 
-        settings = Settings()
         settings.mcp.enabled = True
         settings.mcp.servers = {
             "test-server": MCPServerConfig(
@@ -456,10 +505,12 @@ class TestMCPManagerAsyncOperations:
 
         manager = MCPManager(settings)
         await manager.initialize()
+        original = manager._servers["test-server"].toolset
 
-        # 重新加载存在的服务器
-        result = manager.reload_toolset("test-server")
+        # 重新加载存在的服务器（强制重建）
+        result = manager.reload_toolset("test-server", force=True)
         assert result is True
+        assert manager._servers["test-server"].toolset is not original
         assert manager._servers["test-server"].status == MCPConnectionStatus.PENDING
 
         # 重新加载不存在的服务器
@@ -468,14 +519,40 @@ class TestMCPManagerAsyncOperations:
 
         await manager.shutdown()
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_reload_toolset_skips_unchanged_config(self, settings):
+        """配置未变化时跳过重建，变化或 force 时重建"""
+
+        settings.mcp.enabled = True
+        settings.mcp.servers = {
+            "test-server": MCPServerConfig(command="echo", args=["test"])
+        }
+
+        manager = MCPManager(settings)
+        await manager.initialize()
+        original = manager._servers["test-server"].toolset
+
+        assert manager.reload_toolset("test-server") is True
+        assert manager._servers["test-server"].toolset is original
+
+        assert manager.reload_toolset("test-server", force=True) is True
+        forced = manager._servers["test-server"].toolset
+        assert forced is not original
+
+        settings.mcp.servers["test-server"] = MCPServerConfig(command="echo", args=["changed"])
+        assert manager.reload_toolset("test-server") is True
+        info = manager._servers["test-server"]
+        assert info.toolset is not forced
+        assert info.config.args == ["changed"]
+
+        await manager.shutdown()
+
 
 class TestMCPFailureInvariants:
     """MCP 故障不变量：局部失败不拖垮健康 server；不整轮重放。"""
 
-    def test_one_server_failure_does_not_remove_healthy(self):
-        from services.agent.mcp import MCPManager, MCPConnectionStatus, MCPServerInfo
-
-        manager = MCPManager(Settings())
+    def test_one_server_failure_does_not_remove_healthy(self, settings):
+        manager = MCPManager(settings)
         healthy = object()
         failed = object()
         manager._servers["good"] = MCPServerInfo(
@@ -499,10 +576,8 @@ class TestMCPFailureInvariants:
         assert healthy in toolsets
         assert failed not in toolsets
 
-    def test_get_toolsets_for_agent_uses_healthy_only(self):
-        from services.agent.mcp import MCPManager, MCPConnectionStatus, MCPServerInfo
-
-        manager = MCPManager(Settings())
+    def test_get_toolsets_for_agent_uses_healthy_only(self, settings):
+        manager = MCPManager(settings)
         a = object()
         b = object()
         manager._servers["a"] = MCPServerInfo(
@@ -521,7 +596,7 @@ class TestMCPFailureInvariants:
         assert manager.get_toolsets_for_agent() == [a]
 
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_mcp_timeout_does_not_replay_whole_run(self, monkeypatch):
         """行为测试：本地工具已执行后 MCP timeout 返回结构化错误，且不重跑整轮。
 
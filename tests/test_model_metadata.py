@@ -1,14 +1,10 @@
 """models.dev 元数据解析与缓存测试"""
 
 import json
-import sys
 from pathlib import Path
 
 import pytest
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT))
-
 from config.settings import ModelMetadataConfig
 from services.agent.model_metadata import (
     ModelMetadata,
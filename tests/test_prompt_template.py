@@ -347,6 +347,111 @@ class TestVariableReplacement:
             )
             assert str(length) in prompt
 
+    def test_unknown_braces_kept(self):
+        """非变量的花括号原样保留"""
+        from services.agent.prompt import PromptManager, PromptTemplate
+
+        manager = PromptManager()
+        manager.register_template(
+            PromptTemplate(
+                name="braces",
+                description="花括号",
+                content='玩家 {player_name} 输出 {"ok": true} {custom_note}',
+            )
+        )
+        conn_id = "test-braces"
+        manager.set_connection_template(conn_id, "braces")
+        manager.set_connection_variable(conn_id, "note", "备注")
+
+        prompt = manager.build_system_prompt(
+            connection_id=conn_id,
+            player_name="Steve",
+            provider="deepseek",
+            model="chat",
+        )
+
+        assert 'Steve 输出 {"ok": true} 备注' in prompt
+        assert "--- 自定义变量 ---" not in prompt
+
+    def test_placeholders_inside_system_prompt_expanded(self):
+        """system_prompt 中的 {custom_*} 与 {tool_usage} 同样被展开"""
+        from services.agent.prompt import TOOL_USAGE_GUIDE, PromptManager
+
+        settings = _NarrowRuntimeSettings()
+        settings.system_prompt = "用{custom_style}口吻回答。{tool_usage}"
+
+        manager = PromptManager()
+        conn_id = "test-nested-system-prompt"
+        manager.set_connection_template(conn_id, "default")
+        manager.set_connection_variable(conn_id, "style", "海盗")
+
+        prompt = manager.build_system_prompt(
+            connection_id=conn_id,
+            player_name="Steve",
+            provider="deepseek",
+            model="chat",
+            settings=settings,
+        )
+
+        assert prompt.startswith(f"用海盗口吻回答。{TOOL_USAGE_GUIDE}")
+        assert "{custom_style}" not in prompt
+        assert "{tool_usage}" not in prompt
+        assert "--- 自定义变量 ---" not in prompt
+
+    def test_unreferenced_expensive_variables_not_computed(self, monkeypatch):
+        """模板未引用 tool_usage 时不渲染 runtime harness 提示"""
+        from services.agent import prompt as prompt_module
+
+        def _fail() -> str:
+            raise AssertionError("tool_usage should not be rendered")
+
+        monkeypatch.setattr(prompt_module, "render_runtime_harness_prompt", _fail)
+        settings = _NarrowRuntimeSettings()
+        settings.runtime_harness_enabled = True
+
+        manager = prompt_module.PromptManager()
+        manager.register_template(
+            prompt_module.PromptTemplate(
+                name="plain",
+                description="无工具说明",
+                content="玩家: {player_name}",
+            )
+        )
+        manager.set_connection_template("test-plain", "plain")
+
+        prompt = manager.build_system_prompt(
+            connection_id="test-plain",
+            player_name="Alex",
+            provider="deepseek",
+            model="chat",
+            settings=settings,
+        )
+
+        assert prompt.startswith("玩家: Alex")
+
+    def test_rendered_prompt_cached_until_variables_change(self):
+        """相同输入命中渲染缓存，变量变化后重新渲染"""
+        from services.agent.prompt import PromptManager, _render_prompt
+
+        manager = PromptManager()
+        conn_id = "test-render-cache"
+        kwargs = {
+            "connection_id": conn_id,
+            "player_name": "Steve",
+            "provider": "deepseek",
+            "model": "chat",
+        }
+
+        first = manager.build_system_prompt(**kwargs)
+        hits = _render_prompt.cache_info().hits
+        assert manager.build_system_prompt(**kwargs) == first
+        assert _render_prompt.cache_info().hits == hits + 1
+
+        manager.set_connection_variable(conn_id, "note", "hello")
+        updated = manager.build_system_prompt(**kwargs)
+        assert updated != first
+        assert "note: hello" in updated
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,13 +1,8 @@
 """消息队列上下文管理测试"""
 
 import asyncio
-from pathlib import Path
-import sys
 from uuid import uuid4
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT))
-
 from pydantic_ai.messages import (
     ModelRequest,
     ModelResponse,
@@ -16,8 +11,8 @@ from pydantic_ai.messages import (
     UserPromptPart,
 )
 
-from core.queue import MessageBroker, QueueItem
 from config.settings import Settings
+from core.queue import MessageBroker, QueueItem
 from models.agent import StreamEvent
 from models.messages import ChatRequest, SystemNotification
 from services.agent.worker import AgentWorker
@@ -448,6 +443,18 @@ def test_strip_reasoning_content_for_history() -> None:
     assert sanitized_node.reasoning_content == ""
 
 
+def test_strip_reasoning_content_reuses_clean_messages() -> None:
+    request = ModelRequest(parts=[UserPromptPart(content="hi")])
+    node = _ReasoningNode("")
+    clean = _Container([node, {"child": node}])
+
+    sanitized, cleared_count = AgentWorker._strip_reasoning_content([request, clean])
+
+    assert cleared_count == 0
+    assert sanitized[0] is request
+    assert sanitized[1] is clean
+
+
 def test_strip_reasoning_content_for_thinking_part() -> None:
     message = ModelResponse(
         parts=[ThinkingPart(content="hidden-thought"), TextPart(content="visible")]
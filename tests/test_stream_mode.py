@@ -1,13 +1,12 @@
 """流式输出模式测试（基于 agent.iter() 官方推荐方式）"""
 
 import asyncio
-import sys
 from collections.abc import AsyncIterator
-from pathlib import Path
+from itertools import count
 from types import SimpleNamespace
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock
-from uuid import uuid4
+from uuid import UUID
 
 import pytest
 from pydantic_ai import (
@@ -20,17 +19,22 @@ from pydantic_ai import (
 from pydantic_ai.messages import TextPart, ThinkingPart, ThinkingPartDelta, ToolCallPart, ToolReturnPart
 from pydantic_ai.tools import DeferredToolRequests
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.append(str(ROOT))
-
 from models.agent import AgentDependencies
 from services.agent import core
 
 
+_connection_ids = count(1)
+
+
 async def _noop(_: str) -> None:
     return None
 
 
+def _new_connection_id() -> UUID:
+    """测试内只需唯一的连接 ID，用计数器代替 uuid4。"""
+    return UUID(int=next(_connection_ids))
+
+
 # ============== Mock 事件类（使用 PydanticAI 真实事件类型） ==============
 # 使用真实事件对象避免全局 monkeypatch builtins.isinstance，同时保持测试聚焦 stream mode 行为。
 
@@ -377,7 +381,7 @@ async def _collect_stream_chat_events(
 
 def _build_deps(stream_sentence_mode: bool) -> AgentDependencies:
     return AgentDependencies(
-        connection_id=uuid4(),
+        connection_id=_new_connection_id(),
         player_name="Tester",
         settings=SimpleNamespace(
             stream_sentence_mode=stream_sentence_mode,
@@ -414,33 +418,12 @@ def _patch_agent_node_adapter(monkeypatch) -> None:
 
     monkeypatch.setattr(core.ChatAgentManager, "get_agent", patched_get_agent)
 
-    original_isinstance = isinstance
-
-    def custom_isinstance(obj, classinfo):
-        # Handle PartStartEvent check
-        if classinfo.__name__ == "PartStartEvent" if hasattr(classinfo, "__name__") else False:
-            return hasattr(obj, "index") and hasattr(obj, "part")
-        # Handle PartDeltaEvent check
-        if classinfo.__name__ == "PartDeltaEvent" if hasattr(classinfo, "__name__") else False:
-            return hasattr(obj, "index") and hasattr(obj, "delta")
-        # Handle TextPartDelta check
-        if classinfo.__name__ == "TextPartDelta" if hasattr(classinfo, "__name__") else False:
-            return hasattr(obj, "content_delta")
-        # Handle FunctionToolCallEvent check
-        if classinfo.__name__ == "FunctionToolCallEvent" if hasattr(classinfo, "__name__") else False:
-            return hasattr(obj, "part") and hasattr(obj.part, "tool_name") and hasattr(obj.part, "args")
-        # Handle FunctionToolResultEvent check
-        if classinfo.__name__ == "FunctionToolResultEvent" if hasattr(classinfo, "__name__") else False:
-            return hasattr(obj, "tool_call_id") and hasattr(obj, "result") and not hasattr(obj.part, "args")
-        return original_isinstance(obj, classinfo)
-
-    monkeypatch.setattr("builtins.isinstance", custom_isinstance)
-
 
 # ============== 测试用例 ==============
 
 
-def test_stream_sentence_mode_true_should_stream_by_sentence(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream_sentence_mode_true_should_stream_by_sentence(monkeypatch) -> None:
     """流式模式：按完整句子发送"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -450,15 +433,16 @@ def test_stream_sentence_mode_true_should_stream_by_sentence(monkeypatch) -> Non
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
-    content_events = [event for event in events if event.content]
+    events = await _collect_events("hi", _build_deps(True), model="fake")
+    contents = [event.content for event in events if event.content]
 
-    assert [event.content for event in content_events] == ["你好，世界。", "再见！"]
+    assert contents == ["你好，世界。", "再见！"]
     assert events[-1].metadata is not None
     assert events[-1].metadata.get("is_complete") is True
 
 
-def test_stream_sentence_mode_false_should_batch_after_complete(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream_sentence_mode_false_should_batch_after_complete(monkeypatch) -> None:
     """非流式模式：完整响应后分批发送"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -470,7 +454,7 @@ def test_stream_sentence_mode_false_should_batch_after_complete(monkeypatch) ->
     mock_agent = MockAgent(result_output=full_response)
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(False), model="fake"))
+    events = await _collect_events("hi", _build_deps(False), model="fake")
     content_events = [event for event in events if event.content]
 
     # 总长度 > 150，将分成两个批次发送
@@ -480,7 +464,8 @@ def test_stream_sentence_mode_false_should_batch_after_complete(monkeypatch) ->
     assert events[-1].metadata.get("is_complete") is True
 
 
-def test_stream_chat_tool_result_uses_tool_name_from_call_event(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream_chat_tool_result_uses_tool_name_from_call_event(monkeypatch) -> None:
     _patch_agent_node_adapter(monkeypatch)
 
     agent = MockAgent(
@@ -494,9 +479,7 @@ def test_stream_chat_tool_result_uses_tool_name_from_call_event(monkeypatch) ->
         result_output="已给你钻石。",
     )
 
-    events = asyncio.run(
-        _collect_stream_chat_events("hello", _build_deps(True), object(), agent)
-    )
+    events = await _collect_stream_chat_events("hello", _build_deps(True), object(), agent)
     result_events = [event for event in events if event.event_type == "tool_result"]
 
     assert len(result_events) == 1
@@ -505,7 +488,8 @@ def test_stream_chat_tool_result_uses_tool_name_from_call_event(monkeypatch) ->
     assert result_events[0].metadata["tool_name"] == "run_minecraft_command"
 
 
-def test_tool_call_should_be_recorded_in_tool_events(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tool_call_should_be_recorded_in_tool_events(monkeypatch) -> None:
     """工具调用事件应被记录在 tool_events 中"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -521,7 +505,7 @@ def test_tool_call_should_be_recorded_in_tool_events(monkeypatch) -> None:
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("给我钻石", _build_deps(True), model="fake"))
+    events = await _collect_events("给我钻石", _build_deps(True), model="fake")
 
     # 检查完成事件中的 tool_events
     assert events[-1].metadata is not None
@@ -539,7 +523,8 @@ def test_tool_call_should_be_recorded_in_tool_events(monkeypatch) -> None:
     assert mock_agent.last_usage_limits.tool_calls_limit == 8
 
 
-def test_tool_chain_no_longer_needs_manual_fallback(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tool_chain_no_longer_needs_manual_fallback(monkeypatch) -> None:
     """工具链不再需要手动回退（框架自动处理）"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -555,7 +540,7 @@ def test_tool_chain_no_longer_needs_manual_fallback(monkeypatch) -> None:
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("给我钻石", _build_deps(True), model="fake"))
+    events = await _collect_events("给我钻石", _build_deps(True), model="fake")
     content_events = [event for event in events if event.content]
 
     # 工具调用由框架自动处理，不再需要手动回退
@@ -575,6 +560,18 @@ def test_iter_sentence_batches_should_fallback_for_long_sentence() -> None:
     assert "".join(batches) == long_sentence
 
 
+def test_append_and_extract_sentences_matches_full_rescan() -> None:
+    """逐块追加提取与整段重新扫描结果一致"""
+    chunks = ["你好", "，世界", "。第二", "句！", "tail", " part", ".\n", "end"]
+    buffer = ""
+    sentences: list[str] = []
+    for chunk in chunks:
+        extracted, buffer = core._append_and_extract_sentences(buffer, chunk)
+        sentences.extend(extracted)
+
+    assert (sentences, buffer) == core._extract_complete_sentences("".join(chunks))
+
+
 def test_iter_sentence_batches_default_reads_from_settings(monkeypatch) -> None:
     """未显式传入 max_chars 时，应从 Settings.flow_control.non_stream_batch_max_chars 读取默认值。"""
     from unittest.mock import patch
@@ -622,14 +619,15 @@ def test_non_stream_constants_removed_from_module() -> None:
     assert not hasattr(core, "NON_STREAM_SEND_DELAY")
 
 
-def test_empty_text_chunks_should_not_yield_content_events(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_empty_text_chunks_should_not_yield_content_events(monkeypatch) -> None:
     """空文本列表不应产生内容事件"""
     _patch_agent_node_adapter(monkeypatch)
 
     mock_agent = MockAgent(text_chunks=[], result_output="")
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
+    events = await _collect_events("hi", _build_deps(True), model="fake")
     content_events = [event for event in events if event.content]
 
     # 没有文本内容，只有完成事件
@@ -638,14 +636,15 @@ def test_empty_text_chunks_should_not_yield_content_events(monkeypatch) -> None:
     assert events[-1].metadata.get("is_complete") is True
 
 
-def test_non_stream_mode_uses_run_method(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_non_stream_mode_uses_run_method(monkeypatch) -> None:
     """非流式模式应使用 run() 方法，并传入 UsageLimits。"""
     _patch_agent_node_adapter(monkeypatch)
 
     mock_agent = MockAgent(result_output="这是一个测试响应。")
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(False), model="fake"))
+    events = await _collect_events("hi", _build_deps(False), model="fake")
 
     # 非流式模式调用 run()
     assert mock_agent.run_called is True
@@ -659,7 +658,8 @@ def test_non_stream_mode_uses_run_method(monkeypatch) -> None:
     assert "tool_returns" not in events[-1].metadata
 
 
-def test_multiple_tool_calls_should_all_be_recorded(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_multiple_tool_calls_should_all_be_recorded(monkeypatch) -> None:
     """多个工具调用事件都应被记录"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -676,7 +676,7 @@ def test_multiple_tool_calls_should_all_be_recorded(monkeypatch) -> None:
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("执行多个操作", _build_deps(True), model="fake"))
+    events = await _collect_events("执行多个操作", _build_deps(True), model="fake")
 
     assert events[-1].metadata is not None
     tool_events_list = events[-1].metadata.get("tool_events", [])
@@ -685,7 +685,8 @@ def test_multiple_tool_calls_should_all_be_recorded(monkeypatch) -> None:
     assert tool_events_list[1]["tool_name"] == "send_game_message"
 
 
-def test_stream_sentence_mode_should_not_flush_incomplete_tail_between_request_nodes(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream_sentence_mode_should_not_flush_incomplete_tail_between_request_nodes(monkeypatch) -> None:
     """流式模式：跨 ModelRequestNode 的半句不应提前发送"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -700,13 +701,14 @@ def test_stream_sentence_mode_should_not_flush_incomplete_tail_between_request_n
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
-    content_events = [event for event in events if event.content]
+    events = await _collect_events("hi", _build_deps(True), model="fake")
+    contents = [event.content for event in events if event.content]
 
-    assert [event.content for event in content_events] == ["你好，世界。"]
+    assert contents == ["你好，世界。"]
 
 
-def test_non_stream_mode_should_populate_tool_events_from_messages(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_non_stream_mode_should_populate_tool_events_from_messages(monkeypatch) -> None:
     """非流式模式：应从结果消息中回填工具调用元数据"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -720,7 +722,7 @@ def test_non_stream_mode_should_populate_tool_events_from_messages(monkeypatch)
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("把时间调成白天", _build_deps(False), model="fake"))
+    events = await _collect_events("把时间调成白天", _build_deps(False), model="fake")
 
     assert events[-1].metadata is not None
     tool_events_list = events[-1].metadata.get("tool_events", [])
@@ -769,7 +771,8 @@ def test_chat_agent_manager_explicit_agent_overrides_fallback(monkeypatch) -> No
 # ============== 思考模式（reasoning）测试 ==============
 
 
-def test_thinking_part_start_should_yield_reasoning_not_content(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_thinking_part_start_should_yield_reasoning_not_content(monkeypatch) -> None:
     """ThinkingPart 应按句子缓冲为 reasoning，不应混入 content。"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -788,7 +791,7 @@ def test_thinking_part_start_should_yield_reasoning_not_content(monkeypatch) ->
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
+    events = await _collect_events("hi", _build_deps(True), model="fake")
     reasoning_events = [e for e in events if e.event_type == "reasoning" and e.content]
     content_events = [e for e in events if e.event_type == "content" and e.content]
 
@@ -797,7 +800,8 @@ def test_thinking_part_start_should_yield_reasoning_not_content(monkeypatch) ->
     assert "".join(e.content for e in content_events) == "嗨！"
 
 
-def test_thinking_deltas_should_buffer_until_sentence_end(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_thinking_deltas_should_buffer_until_sentence_end(monkeypatch) -> None:
     """思考流式增量应缓冲到完整句子，再作为 reasoning 下发。"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -819,7 +823,7 @@ def test_thinking_deltas_should_buffer_until_sentence_end(monkeypatch) -> None:
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
+    events = await _collect_events("hi", _build_deps(True), model="fake")
     reasoning_events = [e for e in events if e.event_type == "reasoning" and e.content]
     content_events = [e for e in events if e.event_type == "content" and e.content]
 
@@ -829,7 +833,8 @@ def test_thinking_deltas_should_buffer_until_sentence_end(monkeypatch) -> None:
     assert [e.content for e in content_events] == ["你好！"]
 
 
-def test_thinking_part_delta_after_text_should_not_merge_into_content(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_thinking_part_delta_after_text_should_not_merge_into_content(monkeypatch) -> None:
     """思考增量在前、文本在后的场景，两者不应互相串入。"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -846,7 +851,7 @@ def test_thinking_part_delta_after_text_should_not_merge_into_content(monkeypatc
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
+    events = await _collect_events("hi", _build_deps(True), model="fake")
     reasoning_events = [e for e in events if e.event_type == "reasoning" and e.content]
     content_events = [e for e in events if e.event_type == "content" and e.content]
 
@@ -854,7 +859,8 @@ def test_thinking_part_delta_after_text_should_not_merge_into_content(monkeypatc
     assert "".join(e.content for e in content_events) == "回答。"
 
 
-def test_thinking_tail_should_flush_before_tool_call(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_thinking_tail_should_flush_before_tool_call(monkeypatch) -> None:
     """思考缓冲的未完成尾巴应在进入工具节点前冲刷。"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -878,7 +884,7 @@ def test_thinking_tail_should_flush_before_tool_call(monkeypatch) -> None:
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(True), model="fake"))
+    events = await _collect_events("hi", _build_deps(True), model="fake")
     typed = [
         (e.event_type, e.content)
         for e in events
@@ -892,7 +898,8 @@ def test_thinking_tail_should_flush_before_tool_call(monkeypatch) -> None:
     assert first_reasoning_idx < first_tool_idx
 
 
-def test_non_stream_mode_should_yield_reasoning_from_thinking_parts(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_non_stream_mode_should_yield_reasoning_from_thinking_parts(monkeypatch) -> None:
     """非流式模式：应从结果消息的 ThinkingPart 提取 reasoning 并在 content 之前 yield。"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -906,7 +913,7 @@ def test_non_stream_mode_should_yield_reasoning_from_thinking_parts(monkeypatch)
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("hi", _build_deps(False), model="fake"))
+    events = await _collect_events("hi", _build_deps(False), model="fake")
     typed = [(e.event_type, e.content) for e in events if e.content]
     reasoning = [c for t, c in typed if t == "reasoning"]
     content = [c for t, c in typed if t == "content"]
@@ -919,7 +926,8 @@ def test_non_stream_mode_should_yield_reasoning_from_thinking_parts(monkeypatch)
     assert first_reasoning_idx < first_content_idx
 
 
-def test_stream_approval_required_exits_agent_iter_before_yield(monkeypatch) -> None:
+@pytest.mark.asyncio(loop_scope="module")
+async def test_stream_approval_required_exits_agent_iter_before_yield(monkeypatch) -> None:
     """审批暂停应先干净退出 agent.iter，再 yield approval_required，且不带 is_complete。"""
     _patch_agent_node_adapter(monkeypatch)
 
@@ -939,7 +947,7 @@ def test_stream_approval_required_exits_agent_iter_before_yield(monkeypatch) ->
     )
     monkeypatch.setattr(core, "chat_agent", mock_agent)
 
-    events = asyncio.run(_collect_events("建个房子", _build_deps(True), model="fake"))
+    events = await _collect_events("建个房子", _build_deps(True), model="fake")
     approval_events = [e for e in events if e.event_type == "approval_required"]
     complete_events = [
         e for e in events if e.metadata and e.metadata.get("is_complete")
@@ -1046,7 +1054,7 @@ async def test_worker_approval_required_does_not_cancel_on_return(monkeypatch):
         ),
     )
 
-    connection_id = uuid4()
+    connection_id = _new_connection_id()
     await worker._process_request_locked(
         ChatRequest(
             connection_id=connection_id,